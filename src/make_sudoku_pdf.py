@@ -4,13 +4,14 @@
 from __future__ import annotations
 
 import argparse
-import datetime as _dt
 import importlib.util
 import math
 import random
 import sys
 import time
+from itertools import repeat
 from pathlib import Path
+from types import ModuleType
 from typing import Optional
 
 from project_config import get_config
@@ -62,20 +63,65 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 INCH_PER_CM = 0.3937007874
 
 
+# Modules already loaded by _import_module_from, keyed by (name, path as given),
+# so repeat calls skip the Path.resolve() filesystem lookups.
+_MODULE_CACHE: dict[tuple[str, str], ModuleType] = {}
+
+
 def _import_module_from(path: Path, name: str):
+    key = (name, str(path))
+    mod = _MODULE_CACHE.get(key)
+    if mod is not None and sys.modules.get(name) is mod:
+        return mod
+    cached = sys.modules.get(name)
+    cached_file = getattr(cached, "__file__", None)
+    if cached_file is not None and Path(cached_file).resolve() == path.resolve():
+        _MODULE_CACHE[key] = cached
+        return cached
     spec = importlib.util.spec_from_file_location(name, str(path))
     if spec is None or spec.loader is None:
         raise ImportError(f"Could not load spec for module '{name}' from path '{path}'")
     mod = importlib.util.module_from_spec(spec)
     sys.modules[name] = mod
     spec.loader.exec_module(mod)
+    _MODULE_CACHE[key] = mod
     return mod
 
 
+def _generate_puzzle(index: int, base_seed: int, target: float, time_budget: float):
+    """Generate puzzle number ``index``; falls back to a plain reduction on failure.
+
+    Lives at module level so it can run in worker processes (see ``--jobs``).
+    """
+    generator = _import_module_from(SCRIPT_DIR / "sudoku_generator.py", "sudoku_generator")
+    print(f"Generating puzzle {index + 1}/{DEFAULT_TOTAL_PUZZLES}...")
+    res = generator.generate_interesting(
+        seed=base_seed + index,
+        target_score=target,
+        time_budget=time_budget,
+    )
+    if res is None:
+        print(f"  -> Fallback for puzzle {index + 1}")
+        sol = generator.generate_full_solution(seed=base_seed * FALLBACK_SEED_MULTIPLIER + index)
+        rng = random.Random(base_seed + index)
+        fallback_budget = max(FALLBACK_MIN_TIME, time_budget * FALLBACK_REDUCE_SHARE)
+        pzl, stp, sc, rep = generator.reduce_with_checks(
+            sol,
+            target_score=0.0,
+            rng=rng,
+            time_budget=fallback_budget,
+        )
+        return pzl, sol, sc, rep
+
+    pzl, sol, sc, rep, stp = res
+    print(f"  -> Done. Score: {sc:.1f}")
+    return pzl, sol, sc, rep
+
+
 def _resolve_output_path(out: Optional[str]) -> Path:
     if out:
         return Path(out)
-    timestamp = _dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     return Path(f"{OUTPUT_PREFIX}_{timestamp}.pdf")
 
 
@@ -118,6 +164,12 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_GAP_CM,
         help="Gap between puzzles in centimetres (default from config).",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to generate puzzles (default: 1).",
+    )
     return parser
 
 
@@ -133,7 +185,7 @@ def main(argv: Optional[list[str]] = None) -> int:
     if not gen_path.exists() or not sol_path.exists():
         raise SystemExit("Expected sudoku_generator.py and sudoku_solver.py in the same folder.")
 
-    generator = _import_module_from(gen_path, "sudoku_generator")
+    _import_module_from(gen_path, "sudoku_generator")
 
     total_puzzles = max(1, DEFAULT_TOTAL_PUZZLES)
     puzzles_per_page = PUZZLES_PER_PAGE
@@ -142,36 +194,22 @@ def main(argv: Optional[list[str]] = None) -> int:
     print(f"Generating {total_puzzles} puzzles with base seed: {base_seed}")
     puzzles, solutions, scores, reports = [], [], [], []
 
-    for i in range(total_puzzles):
-        print(f"Generating puzzle {i + 1}/{total_puzzles}...")
-        res = generator.generate_interesting(
-            seed=base_seed + i,
-            target_score=args.target,
-            time_budget=args.time,
-        )
-        if res is None:
-            print(f"  -> Fallback for puzzle {i + 1}")
-            sol = generator.generate_full_solution(seed=base_seed * FALLBACK_SEED_MULTIPLIER + i)
-            rng = random.Random(base_seed + i)
-            fallback_budget = max(FALLBACK_MIN_TIME, args.time * FALLBACK_REDUCE_SHARE)
-            pzl, stp, sc, rep = generator.reduce_with_checks(
-                sol,
-                target_score=0.0,
-                rng=rng,
-                time_budget=fallback_budget,
-            )
-            puzzles.append(pzl)
-            solutions.append(sol)
-            scores.append(sc)
-            reports.append(rep)
-            continue
+    # Each puzzle depends only on its own seed, so they can be generated in parallel.
+    # Processes rather than threads: generation is pure-Python CPU work.
+    work = (range(total_puzzles), repeat(base_seed), repeat(args.target), repeat(args.time))
+    if args.jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_generate_puzzle, *work))
+    else:
+        results = map(_generate_puzzle, *work)
 
-        pzl, sol, sc, rep, stp = res
+    for pzl, sol, sc, rep in results:
         puzzles.append(pzl)
         solutions.append(sol)
         scores.append(sc)
         reports.append(rep)
-        print(f"  -> Done. Score: {sc:.1f}")
 
     from matplotlib.backends.backend_pdf import PdfPages
     import matplotlib.pyplot as plt
@@ -185,25 +223,28 @@ def main(argv: Optional[list[str]] = None) -> int:
     avail_h = page_h_in - 2 * margin_in - gap_in * (LAYOUT_ROWS - 1)
     grid_size = min(avail_w / max(1, LAYOUT_COLS), avail_h / max(1, LAYOUT_ROWS))
 
+    # All grids share the same size, so line positions, cell centres and the
+    # font size are computed once instead of for every puzzle.
+    grid_lines = [(idx / 9, 1.5 if idx % 3 else 3.0) for idx in range(10)]
+    cell_centres = [
+        (r, c, (c + 0.5) / 9, 1 - (r + 0.5) / 9) for r in range(9) for c in range(9)
+    ]
+    font_size = max(1, int(FONT_SCALE * grid_size * 72 / 9))
+
     def draw_grid(ax, puzzle, left_in, bottom_in, size_in):
         ax.set_position([left_in / page_w_in, bottom_in / page_h_in, size_in / page_w_in, size_in / page_h_in])
         ax.tick_params(axis="both", which="both", bottom=False, top=False, left=False, right=False,
                        labelbottom=False, labelleft=False)
-        for idx in range(10):
-            linewidth = 1.5 if idx % 3 else 3.0
-            ax.axvline(idx / 9, color="k", linewidth=linewidth)
-            ax.axhline(idx / 9, color="k", linewidth=linewidth)
+        for pos, linewidth in grid_lines:
+            ax.axvline(pos, color="k", linewidth=linewidth)
+            ax.axhline(pos, color="k", linewidth=linewidth)
         ax.set_xlim(0, 1)
         ax.set_ylim(0, 1)
         ax.axis("off")
-        font_size = max(1, int(FONT_SCALE * size_in * 72 / 9))
-        for r in range(9):
-            for c in range(9):
-                value = puzzle[r][c]
-                if value:
-                    x = (c + 0.5) / 9
-                    y = 1 - (r + 0.5) / 9
-                    ax.text(x, y, str(value), ha="center", va="center", fontsize=font_size)
+        for r, c, x, y in cell_centres:
+            value = puzzle[r][c]
+            if value:
+                ax.text(x, y, str(value), ha="center", va="center", fontsize=font_size)
 
     footer_y_pos_norm = (FOOTER_OFFSET_CM * INCH_PER_CM) / page_h_in
 
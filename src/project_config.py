@@ -13,10 +13,11 @@ except ModuleNotFoundError:  # pragma: no cover - fallback for older Python
 
 
 _CONFIG_FILENAME = "config.toml"
+_CONFIG_PATH = Path(__file__).resolve().parents[1] / _CONFIG_FILENAME
 
 
 def _config_path() -> Path:
-    return Path(__file__).resolve().parents[1] / _CONFIG_FILENAME
+    return _CONFIG_PATH
 
 
 @lru_cache(maxsize=1)
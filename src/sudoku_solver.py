@@ -4,8 +4,8 @@
 # Naked Pairs, Hidden Pairs). No guessing. Designed for extensibility.
 
 from dataclasses import dataclass, field
+from itertools import combinations
 from typing import List, Set, Tuple, Dict, Optional
-from copy import deepcopy
 
 Digit = int  # 1..9
 Cell = Tuple[int, int]  # (r, c) 0..8
@@ -15,16 +15,33 @@ def box_index(r: int, c: int) -> int:
 
 ALL_DIGITS: Set[Digit] = set(range(1, 10))
 
+# 9-bit candidate mask (digit d -> bit d-1) and the digits each mask stands for
+FULL_MASK = (1 << 9) - 1
+MASK_DIGITS = tuple(tuple(d for d in range(1, 10) if mask & (1 << (d - 1))) for mask in range(1 << 9))
+
+# Byte -> cell value for parsing: b'1'..b'9' map to 1..9, anything else is an empty cell
+CELL_VALUES = bytes(b - 48 if 49 <= b <= 57 else 0 for b in range(256))
+
 ROWS = [[(r, c) for c in range(9)] for r in range(9)]
 COLS = [[(r, c) for r in range(9)] for c in range(9)]
 BOXES = [[(r, c) for r in range(br * 3, br * 3 + 3) for c in range(bc * 3, bc * 3 + 3)]
          for br in range(3) for bc in range(3)]
 
+# Box cells as frozensets for O(1) membership tests
+BOX_CELLS = [frozenset(box) for box in BOXES]
+
 UNITS: List[List[Cell]] = []
 UNITS.extend(ROWS)
 UNITS.extend(COLS)
 UNITS.extend(BOXES)
 
+# (unit, unit_type, unit_index) in scan order: rows, then columns, then boxes
+LABELED_UNITS: List[Tuple[List[Cell], str, int]] = (
+    [(unit, "row", idx) for idx, unit in enumerate(ROWS)]
+    + [(unit, "col", idx) for idx, unit in enumerate(COLS)]
+    + [(unit, "box", idx) for idx, unit in enumerate(BOXES)]
+)
+
 PEERS: Dict[Cell, Set[Cell]] = {}
 for r in range(9):
     for c in range(9):
@@ -33,7 +50,7 @@ for r in range(9):
         PEERS[(r, c)] = peers
 
 
-@dataclass
+@dataclass(slots=True)
 class Step:
     technique: str
     placements: List[Tuple[Cell, Digit]] = field(default_factory=list)
@@ -58,9 +75,11 @@ class Step:
 
 
 class Grid:
+    __slots__ = ("grid", "cands")
+
     def __init__(self, grid: List[List[int]]):
         assert len(grid) == 9 and all(len(row) == 9 for row in grid)
-        self.grid = deepcopy(grid)
+        self.grid = [row[:] for row in grid]
         self.cands: Dict[Cell, Set[Digit]] = {}
         self._init_candidates()
 
@@ -68,27 +87,35 @@ class Grid:
     def from_string(s: str) -> "Grid":
         s = s.strip().replace("\n", "").replace(" ", "")
         assert len(s) == 81, "Expected 81 characters"
-        grid = []
-        i = 0
-        for r in range(9):
-            row = []
-            for c in range(9):
-                ch = s[i]; i += 1
-                row.append(int(ch) if ch.isdigit() and ch != '0' else 0)
-            grid.append(row)
-        return Grid(grid)
+        values = list(s.encode("ascii", "replace").translate(CELL_VALUES))
+        return Grid([values[i:i + 9] for i in range(0, 81, 9)])
 
     def clone(self) -> "Grid":
         return Grid(self.grid)
 
     def _init_candidates(self):
+        grid = self.grid
+        cands = self.cands
+        # Digits used by each unit are shared by all nine of its cells: collect them once,
+        # as 9-bit masks (digit d -> bit d-1).
+        row_used = [0] * 9
+        col_used = [0] * 9
+        box_used = [0] * 9
         for r in range(9):
+            row = grid[r]
             for c in range(9):
-                if self.grid[r][c] == 0:
-                    used = {self.grid[rr][cc] for (rr, cc) in PEERS[(r, c)] if self.grid[rr][cc] != 0}
-                    self.cands[(r, c)] = ALL_DIGITS - used
+                v = row[c]
+                if v:
+                    bit = 1 << (v - 1)
+                    row_used[r] |= bit; col_used[c] |= bit; box_used[box_index(r, c)] |= bit
+        for r in range(9):
+            row = grid[r]
+            for c in range(9):
+                if row[c] == 0:
+                    used = row_used[r] | col_used[c] | box_used[box_index(r, c)]
+                    cands[(r, c)] = set(MASK_DIGITS[FULL_MASK & ~used])
                 else:
-                    self.cands[(r, c)] = set()
+                    cands[(r, c)] = set()
 
     def is_solved(self) -> bool:
         return all(self.grid[r][c] != 0 for r in range(9) for c in range(9))
@@ -116,7 +143,7 @@ class Grid:
         return self.cands[(r, c)]
 
     def as_string(self) -> str:
-        return ''.join(str(self.grid[r][c] or 0) for r in range(9) for c in range(9))
+        return ''.join([str(v or 0) for row in self.grid for v in row])
 
     def __str__(self) -> str:
         lines = []
@@ -137,10 +164,12 @@ class Grid:
 class Techniques:
     @staticmethod
     def naked_single(g: Grid) -> Optional[Step]:
+        grid, cands = g.grid, g.cands
         for r in range(9):
+            row = grid[r]
             for c in range(9):
-                if g.grid[r][c] == 0:
-                    cand = g.candidates(r, c)
+                if row[c] == 0:
+                    cand = cands[(r, c)]
                     if len(cand) == 1:
                         d = next(iter(cand))
                         st = Step("Naked Single", placements=[((r, c), d)], difficulty=0.5,
@@ -151,14 +180,8 @@ class Techniques:
 
     @staticmethod
     def hidden_single(g: Grid) -> Optional[Step]:
-        for unit_idx, unit in enumerate(ROWS):
-            res = Techniques._hidden_single_in_unit(g, unit, "row", unit_idx)
-            if res: return res
-        for unit_idx, unit in enumerate(COLS):
-            res = Techniques._hidden_single_in_unit(g, unit, "col", unit_idx)
-            if res: return res
-        for unit_idx, unit in enumerate(BOXES):
-            res = Techniques._hidden_single_in_unit(g, unit, "box", unit_idx)
+        for unit, unit_type, unit_idx in LABELED_UNITS:
+            res = Techniques._hidden_single_in_unit(g, unit, unit_type, unit_idx)
             if res: return res
         return None
 
@@ -169,6 +192,8 @@ class Techniques:
             for (r, c) in unit:
                 if g.grid[r][c] == 0 and d in g.candidates(r, c):
                     spots.append((r, c))
+                    if len(spots) > 1:
+                        break  # already not a hidden single
             if len(spots) == 1:
                 (r, c) = spots[0]
                 st = Step("Hidden Single", placements=[((r, c), d)], difficulty=0.7, unit_type=unit_type,
@@ -179,45 +204,49 @@ class Techniques:
 
     @staticmethod
     def locked_candidates(g: Grid) -> Optional[Step]:
+        grid, cands = g.grid, g.cands
         # Pointing within boxes
         for b_idx, box in enumerate(BOXES):
+            in_box = BOX_CELLS[b_idx]
             for d in range(1, 10):
-                rows_set = set(); cols_set = set(); cells = []
+                # Rows/cols holding d as bitmasks (bit r / bit c); a single set bit means confined
+                rows_mask = cols_mask = count = 0
                 for (r, c) in box:
-                    if g.grid[r][c] == 0 and d in g.candidates(r, c):
-                        rows_set.add(r); cols_set.add(c); cells.append((r, c))
-                if len(cells) >= 2:
-                    if len(rows_set) == 1:
-                        target_row = next(iter(rows_set))
-                        st = Step("Locked Candidates (Pointing)", difficulty=1.2, unit_type="box", unit_index=b_idx,
-                                  notes=f"In box {b_idx+1}, digit {d} confined to row {target_row+1}; eliminate from row.")
+                    if grid[r][c] == 0 and d in cands[(r, c)]:
+                        rows_mask |= 1 << r; cols_mask |= 1 << c; count += 1
+                if count >= 2:
+                    if rows_mask & (rows_mask - 1) == 0:
+                        target_row = rows_mask.bit_length() - 1
+                        st = Step("Locked Candidates (Pointing)", difficulty=1.2, unit_type="box", unit_index=b_idx)
                         changed = False
                         for (r, c) in ROWS[target_row]:
-                            if (r, c) not in box and g.grid[r][c] == 0 and d in g.candidates(r, c):
+                            if (r, c) not in in_box and g.grid[r][c] == 0 and d in g.candidates(r, c):
                                 changed |= g.eliminate(r, c, d, st)
                         if changed:
+                            st.notes = f"In box {b_idx+1}, digit {d} confined to row {target_row+1}; eliminate from row."
                             return st
-                    if len(cols_set) == 1:
-                        target_col = next(iter(cols_set))
-                        st = Step("Locked Candidates (Pointing)", difficulty=1.2, unit_type="box", unit_index=b_idx,
-                                  notes=f"In box {b_idx+1}, digit {d} confined to col {target_col+1}; eliminate from column.")
+                    if cols_mask & (cols_mask - 1) == 0:
+                        target_col = cols_mask.bit_length() - 1
+                        st = Step("Locked Candidates (Pointing)", difficulty=1.2, unit_type="box", unit_index=b_idx)
                         changed = False
                         for (r, c) in COLS[target_col]:
-                            if (r, c) not in box and g.grid[r][c] == 0 and d in g.candidates(r, c):
+                            if (r, c) not in in_box and g.grid[r][c] == 0 and d in g.candidates(r, c):
                                 changed |= g.eliminate(r, c, d, st)
                         if changed:
+                            st.notes = f"In box {b_idx+1}, digit {d} confined to col {target_col+1}; eliminate from column."
                             return st
 
         # Claiming in rows
         for r in range(9):
             for d in range(1, 10):
-                cells = [(r, c) for c in range(9) if g.grid[r][c] == 0 and d in g.candidates(r, c)]
+                cells = [(r, c) for c in range(9) if grid[r][c] == 0 and d in cands[(r, c)]]
                 if len(cells) >= 2:
-                    boxes = {box_index(r, c) for (r, c) in cells}
-                    if len(boxes) == 1:
-                        b = next(iter(boxes))
-                        st = Step("Locked Candidates (Claiming)", difficulty=1.3, unit_type="row", unit_index=r,
-                                  notes=f"In row {r+1}, candidates for {d} confined to box {b+1}; eliminate inside box.")
+                    boxes_mask = 0
+                    for (rr, cc) in cells:
+                        boxes_mask |= 1 << box_index(rr, cc)
+                    if boxes_mask & (boxes_mask - 1) == 0:
+                        b = boxes_mask.bit_length() - 1
+                        st = Step("Locked Candidates (Claiming)", difficulty=1.3, unit_type="row", unit_index=r)
                         changed = False
                         for (rr, cc) in BOXES[b]:
                             if rr == r: 
@@ -225,18 +254,20 @@ class Techniques:
                             if g.grid[rr][cc] == 0 and d in g.candidates(rr, cc):
                                 changed |= g.eliminate(rr, cc, d, st)
                         if changed:
+                            st.notes = f"In row {r+1}, candidates for {d} confined to box {b+1}; eliminate inside box."
                             return st
 
         # Claiming in columns
         for c in range(9):
             for d in range(1, 10):
-                cells = [(r, c) for r in range(9) if g.grid[r][c] == 0 and d in g.candidates(r, c)]
+                cells = [(r, c) for r in range(9) if grid[r][c] == 0 and d in cands[(r, c)]]
                 if len(cells) >= 2:
-                    boxes = {box_index(r, c) for (r, c) in cells}
-                    if len(boxes) == 1:
-                        b = next(iter(boxes))
-                        st = Step("Locked Candidates (Claiming)", difficulty=1.3, unit_type="col", unit_index=c,
-                                  notes=f"In col {c+1}, candidates for {d} confined to box {b+1}; eliminate inside box.")
+                    boxes_mask = 0
+                    for (rr, cc) in cells:
+                        boxes_mask |= 1 << box_index(rr, cc)
+                    if boxes_mask & (boxes_mask - 1) == 0:
+                        b = boxes_mask.bit_length() - 1
+                        st = Step("Locked Candidates (Claiming)", difficulty=1.3, unit_type="col", unit_index=c)
                         changed = False
                         for (rr, cc) in BOXES[b]:
                             if cc == c: 
@@ -244,22 +275,25 @@ class Techniques:
                             if g.grid[rr][cc] == 0 and d in g.candidates(rr, cc):
                                 changed |= g.eliminate(rr, cc, d, st)
                         if changed:
+                            st.notes = f"In col {c+1}, candidates for {d} confined to box {b+1}; eliminate inside box."
                             return st
 
         return None
 
     @staticmethod
     def naked_pairs(g: Grid) -> Optional[Step]:
+        grid, cands = g.grid, g.cands
+
         def process_unit(unit, unit_type, unit_index):
             pairs: Dict[Tuple[int, int], List[Cell]] = {}
             for (r, c) in unit:
-                if g.grid[r][c] == 0 and len(g.candidates(r, c)) == 2:
-                    key = tuple(sorted(g.candidates(r, c)))
-                    pairs.setdefault(key, []).append((r, c))
+                if grid[r][c] == 0:
+                    cand = cands[(r, c)]
+                    if len(cand) == 2:
+                        pairs.setdefault(tuple(sorted(cand)), []).append((r, c))
             for (a, b), cells in pairs.items():
                 if len(cells) == 2:
-                    st = Step("Naked Pairs", difficulty=1.6, unit_type=unit_type, unit_index=unit_index,
-                              notes=f"Pair {{{a},{b}}} locked in two cells in {unit_type} {unit_index+1}")
+                    st = Step("Naked Pairs", difficulty=1.6, unit_type=unit_type, unit_index=unit_index)
                     changed = False
                     for (r, c) in unit:
                         if (r, c) not in cells and g.grid[r][c] == 0:
@@ -268,17 +302,12 @@ class Techniques:
                             if b in g.candidates(r, c):
                                 changed |= g.eliminate(r, c, b, st)
                     if changed:
+                        st.notes = f"Pair {{{a},{b}}} locked in two cells in {unit_type} {unit_index+1}"
                         return st
             return None
 
-        for idx, unit in enumerate(ROWS):
-            res = process_unit(unit, "row", idx)
-            if res: return res
-        for idx, unit in enumerate(COLS):
-            res = process_unit(unit, "col", idx)
-            if res: return res
-        for idx, unit in enumerate(BOXES):
-            res = process_unit(unit, "box", idx)
+        for unit, unit_type, idx in LABELED_UNITS:
+            res = process_unit(unit, unit_type, idx)
             if res: return res
         return None
 
@@ -297,25 +326,19 @@ class Techniques:
                     cells1, cells2 = digit_cells[d1], digit_cells[d2]
                     if len(cells1) == 2 and cells1 == cells2:
                         cells = cells1
-                        st = Step("Hidden Pairs", difficulty=1.8, unit_type=unit_type, unit_index=unit_index,
-                                  notes=f"Digits {{{d1},{d2}}} appear only in two same cells in {unit_type} {unit_index+1}")
+                        st = Step("Hidden Pairs", difficulty=1.8, unit_type=unit_type, unit_index=unit_index)
                         changed = False
                         for (r, c) in cells:
                             to_remove = g.candidates(r, c) - {d1, d2}
                             for d in list(to_remove):
                                 changed |= g.eliminate(r, c, d, st)
                         if changed:
+                            st.notes = f"Digits {{{d1},{d2}}} appear only in two same cells in {unit_type} {unit_index+1}"
                             return st
             return None
 
-        for idx, unit in enumerate(ROWS):
-            res = process_unit(unit, "row", idx)
-            if res: return res
-        for idx, unit in enumerate(COLS):
-            res = process_unit(unit, "col", idx)
-            if res: return res
-        for idx, unit in enumerate(BOXES):
-            res = process_unit(unit, "box", idx)
+        for unit, unit_type, idx in LABELED_UNITS:
+            res = process_unit(unit, unit_type, idx)
             if res: return res
         return None
 
@@ -345,8 +368,7 @@ class Techniques:
                         if cols1 == cols2:
                             c1, c2 = cols1
                             st = Step("X-Wing (Rows)", difficulty=2.2, unit_type="rows",
-                                      unit_index=None,
-                                      notes=f"Digit {d} forms X-Wing on rows {r1+1},{r2+1} and columns {c1+1},{c2+1}")
+                                      unit_index=None)
                             changed = False
                             # eliminate d in columns c1,c2 from rows other than r1,r2
                             for r in range(9):
@@ -356,6 +378,7 @@ class Techniques:
                                     if g.grid[r][c] == 0 and d in g.candidates(r, c):
                                         changed |= g.eliminate(r, c, d, st)
                             if changed:
+                                st.notes = f"Digit {d} forms X-Wing on rows {r1+1},{r2+1} and columns {c1+1},{c2+1}"
                                 return st
             return None
 
@@ -374,8 +397,7 @@ class Techniques:
                         if rows1 == rows2:
                             r1, r2 = rows1
                             st = Step("X-Wing (Cols)", difficulty=2.2, unit_type="cols",
-                                      unit_index=None,
-                                      notes=f"Digit {d} forms X-Wing on columns {c1+1},{c2+1} and rows {r1+1},{r2+1}")
+                                      unit_index=None)
                             changed = False
                             for c in range(9):
                                 if c in (c1, c2):
@@ -384,6 +406,7 @@ class Techniques:
                                     if g.grid[r][c] == 0 and d in g.candidates(r, c):
                                         changed |= g.eliminate(r, c, d, st)
                             if changed:
+                                st.notes = f"Digit {d} forms X-Wing on columns {c1+1},{c2+1} and rows {r1+1},{r2+1}"
                                 return st
             return None
 
@@ -433,12 +456,12 @@ class Techniques:
                     # elimination targets: intersection of peers(A) & peers(B)
                     inter = peers(A_cell) & peers(B_cell)
                     changed = False
-                    st = Step("XY-Wing", difficulty=2.5, unit_type="composite", unit_index=None,
-                              notes=f"Pivot {P[0]+1},{P[1]+1} with {x}/{y}, pincers {A_cell[0]+1},{A_cell[1]+1} and {B_cell[0]+1},{B_cell[1]+1} eliminate {z}")
+                    st = Step("XY-Wing", difficulty=2.5, unit_type="composite", unit_index=None)
                     for (r, c) in inter:
                         if g.grid[r][c] == 0 and z in g.candidates(r, c):
                             changed |= g.eliminate(r, c, z, st)
                     if changed:
+                        st.notes = f"Pivot {P[0]+1},{P[1]+1} with {x}/{y}, pincers {A_cell[0]+1},{A_cell[1]+1} and {B_cell[0]+1},{B_cell[1]+1} eliminate {z}"
                         return st
         return None
 
@@ -459,7 +482,6 @@ class Techniques:
                         row_cols[r] = set(cols)
                 rows = list(row_cols.keys())
                 # try all combos of 3 rows
-                from itertools import combinations
                 for r1, r2, r3 in combinations(rows, 3):
                     cols_union = row_cols[r1] | row_cols[r2] | row_cols[r3]
                     if len(cols_union) != 3:
@@ -467,8 +489,7 @@ class Techniques:
                     # ensure each row has candidates only within union
                     if not (row_cols[r1] <= cols_union and row_cols[r2] <= cols_union and row_cols[r3] <= cols_union):
                         continue
-                    st = Step("Swordfish (Rows)", difficulty=2.8, unit_type="rows",
-                              notes=f"Digit {d} forms Swordfish on rows {r1+1},{r2+1},{r3+1} and columns {sorted([c+1 for c in cols_union])}")
+                    st = Step("Swordfish (Rows)", difficulty=2.8, unit_type="rows")
                     changed = False
                     for r in range(9):
                         if r in (r1, r2, r3):
@@ -477,6 +498,7 @@ class Techniques:
                             if g.grid[r][c] == 0 and d in g.candidates(r, c):
                                 changed |= g.eliminate(r, c, d, st)
                     if changed:
+                        st.notes = f"Digit {d} forms Swordfish on rows {r1+1},{r2+1},{r3+1} and columns {sorted([c+1 for c in cols_union])}"
                         return st
             return None
 
@@ -488,15 +510,13 @@ class Techniques:
                     if 2 <= len(rows) <= 3:
                         col_rows[c] = set(rows)
                 cols = list(col_rows.keys())
-                from itertools import combinations
                 for c1, c2, c3 in combinations(cols, 3):
                     rows_union = col_rows[c1] | col_rows[c2] | col_rows[c3]
                     if len(rows_union) != 3:
                         continue
                     if not (col_rows[c1] <= rows_union and col_rows[c2] <= rows_union and col_rows[c3] <= rows_union):
                         continue
-                    st = Step("Swordfish (Cols)", difficulty=2.8, unit_type="cols",
-                              notes=f"Digit {d} forms Swordfish on columns {c1+1},{c2+1},{c3+1} and rows {sorted([r+1 for r in rows_union])}")
+                    st = Step("Swordfish (Cols)", difficulty=2.8, unit_type="cols")
                     changed = False
                     for c in range(9):
                         if c in (c1, c2, c3):
@@ -505,6 +525,7 @@ class Techniques:
                             if g.grid[r][c] == 0 and d in g.candidates(r, c):
                                 changed |= g.eliminate(r, c, d, st)
                     if changed:
+                        st.notes = f"Digit {d} forms Swordfish on columns {c1+1},{c2+1},{c3+1} and rows {sorted([r+1 for r in rows_union])}"
                         return st
             return None
 
@@ -525,20 +546,20 @@ TECHNIQUE_ORDER = [
     Techniques.swordfish,
 ]
 
+# Solve phase by number of filled cells (0..81): A < 30 <= B < 55 <= C
+PHASE_BY_FILLED = tuple('A' if n < 30 else 'B' if n < 55 else 'C' for n in range(82))
+
 
 class LogicSolver:
+    __slots__ = ("grid", "steps")
+
     def __init__(self, grid: Grid):
         self.grid = grid
         self.steps: List[Step] = []
 
     def _phase(self) -> str:
-        filled = sum(1 for r in range(9) for c in range(9) if self.grid.grid[r][c] != 0)
-        if filled < 30:
-            return 'A'
-        elif filled < 55:
-            return 'B'
-        else:
-            return 'C'
+        filled = 81 - sum(row.count(0) for row in self.grid.grid)
+        return PHASE_BY_FILLED[filled]
 
     def step_once(self) -> Optional[Step]:
         for fn in TECHNIQUE_ORDER: